@@ -220,6 +220,7 @@ class conveyorBelt(_mutliReplicaApproach):
         if self._default_metropolis_criterion(originalParams=oldEne, swappedParams=newEne):
             for i in self.replicas:
                 self.replicas[i]._update_dHdLambda()
+                self.replicas[i].update_current_state()
 
             self.__tmp_exchange_traj.append({"Step": self._currentTrial, "capital_lambda": self.capital_lambda, "TotE": float(newEne),
                  "biasE": self.biasene, "doAccept": True})
@@ -229,6 +230,7 @@ class conveyorBelt(_mutliReplicaApproach):
 
             for i in self.replicas:
                 self.replicas[i]._update_dHdLambda()
+                self.replicas[i].update_current_state()
 
             self.__tmp_exchange_traj.append({"Step": self._currentTrial, "capital_lambda": oldBlam, "TotE": float(oldEne),
                  "biasE": float(oldBiasene), "doAccept": False})
@@ -4,12 +4,19 @@ This module shall be used to implement subclasses of Potential. This module cont
 """
 
 import typing as t
+import warnings
 
 import numpy as np
 import scipy.constants as const
 import sympy as sp
 
-from ensembler.potentials._basicPotentials import _potential1DCls, _potential1DClsPerturbed
+try:
+    from numba import njit
+except ImportError:  # numba is optional, without it the numpy implementations are used directly
+    def njit(*args, **kwargs):
+        return lambda function: function
+
+from ensembler.potentials._basicPotentials import _potential1DCls, _potential1DClsPerturbed, _evaluate_numbers
 
 from ensembler.util.ensemblerTypes import Union, Number, Iterable, systemCls
 """
@@ -324,11 +331,11 @@ class gaussPotential(_potential1DCls):
         This function is needed to simplyfiy the symbolic equation on the fly and to calculate the position derivateive.
         """
 
-        self.V = self.V_functional.subs(self.constants)
+        self.V = _evaluate_numbers(self.V_functional.subs(self.constants))
 
         self.dVdpos_functional = sp.diff(self.V_functional, self.position)  # not always working!
         self.dVdpos = sp.diff(self.V, self.position)
-        self.dVdpos = self.dVdpos.subs(self.constants)
+        self.dVdpos = _evaluate_numbers(self.dVdpos.subs(self.constants))
 
         self._calculate_energies = sp.lambdify(self.position, self.V, "numpy")
         self._calculate_dVdpos = sp.lambdify(self.position, self.dVdpos, "numpy")
@@ -1064,15 +1071,23 @@ class dummyPotential(_potential1DCls):
 
         """
 
-        self.V_functional = sp.Lambda(self.position, self.y_shift)
+        self.V_functional = self.y_shift
 
         self.constants = {self.y_shift: y_shift}
-        self.V = self.V_functional.subs(self.constants)
-        self.dVdpos = sp.diff(self.V, self.position)
         super().__init__()
 
-        self._calculate_energies = lambda positions: np.squeeze(np.full(len(positions), y_shift))
-        self.dVdpos = self._calculate_dVdpos = lambda positions: np.squeeze(np.zeros(len(positions)))
+    def _update_functions(self):
+        """
+        The constant energies and forces are returned as read-only views of cached arrays,
+        so no new arrays are allocated in each call.
+        """
+        super()._update_functions()
+
+        self._cached_const = np.array(self.constants[self.y_shift], dtype=float)
+        self._cached_zero = np.zeros(1)
+        self._calculate_energies = lambda positions: np.squeeze(np.broadcast_to(self._cached_const,
+                                                                                (len(positions),)))
+        self._calculate_dVdpos = lambda positions: np.squeeze(np.broadcast_to(self._cached_zero, (len(positions),)))
 
 
 class flatwellPotential(_potential1DCls):
@@ -1164,9 +1179,7 @@ class addedPotentials(_potential1DCls):
 
         self.V_functional = origPotential.V + self.addPotential.V
 
-        self.V = self.V_functional.subs(self.constants)
-        self.dVdpos = sp.diff(self.V, self.position)
-
+        # V and dVdpos are substituted, derived and lambdified once in _update_functions
         super().__init__()
 
 class sumPotentials(_potential1DCls):
@@ -1241,7 +1254,66 @@ class sumPotentials(_potential1DCls):
 """
 
 
-class metadynamicsPotential(_potential1DCls):
+@njit(cache=True)
+def _nearest_uniform(x, x0, inv_dx, n):
+    """
+    returns the index of the bin closest to x on a uniform grid with n bins, the first bin center x0 and
+    the inverse bin width inv_dx.
+    """
+    idx = int((x - x0) * inv_dx + 0.5)
+    return min(max(idx, 0), n - 1)
+
+
+@njit(cache=True)
+def _grid_lookup(positions, grid, x0, inv_dx):
+    """
+    returns the grid values of the bins closest to each of the 1D positions on a uniform grid with the first
+    bin center x0 and the inverse bin width inv_dx.
+    """
+    bins = ((positions - x0) * inv_dx + 0.5).astype(np.intp)
+    return grid[np.minimum(np.maximum(bins, 0), grid.size - 1)]
+
+
+def _grid_lookup_cuda(positions, grid, x0, inv_dx):
+    """
+    same as _grid_lookup, for a grid stored on the gpu with cupy. The positions are transferred to the gpu and the
+    looked up grid values are returned to the host.
+    """
+    import cupy as cp  # optional, only needed for bias grids on the gpu
+    bins = ((cp.asarray(positions) - x0) * inv_dx + 0.5).astype(cp.intp)
+    return cp.asnumpy(grid[cp.clip(bins, 0, grid.size - 1)])
+
+
+class _gaussianBias1DCls(_potential1DCls):
+    '''
+    Base class for the metadynamics potentials, which add gaussians on top of an original 1D potential.
+    The added gaussians are evaluated numerically, only the original potential is evaluated with sympy functions.
+    '''
+    origPotential: _potential1DCls
+
+    def _update_functions(self):
+        """
+        The lambdified functions of the original potential are reused instead of substituting, deriving and
+        lambdifying it again.
+        """
+        self.V = self.origPotential.V
+        self.dVdpos_functional = self.origPotential.dVdpos_functional
+        self.dVdpos = self.origPotential.dVdpos
+
+        self._calculate_energies = self.origPotential._calculate_energies
+        self._calculate_dVdpos = self.origPotential._calculate_dVdpos
+
+    def _set_gaussian_width(self, sigma: float):
+        """
+        sets the standard deviation of the added gaussians and its reciprocals, so the gaussians are evaluated
+        without divisions.
+        """
+        self.sigma = sigma
+        self._inv_sigma2 = 1.0 / (sigma * sigma)
+        self._inv_two_sigma2 = 0.5 * self._inv_sigma2
+
+
+class metadynamicsPotential(_gaussianBias1DCls):
     '''
     The metadynamics bias potential adds 1D Gaussian potentials on top of
     the original 1D potential. The added gaussian potential is centered on the current position.
@@ -1256,7 +1328,7 @@ class metadynamicsPotential(_potential1DCls):
 
     def __init__(self, origPotential=harmonicOscillatorPotential(), amplitude=0.1, sigma=1, n_trigger=100,
                  bias_grid_min=0, bias_grid_max=10,
-                 numbins=100):
+                 numbins=100, precision=np.float32, device="cpu"):
 
         '''
         This is the Constructor of the metadynamicsPotential class.
@@ -1276,21 +1348,44 @@ class metadynamicsPotential(_potential1DCls):
             max value of the bias grid
         numbins: float
             size of the grid bias and forces are saved in
+        precision: np.dtype, optional
+            floating point type of the bias grids, use np.float64 if single precision is not sufficient
+            (default: np.float32)
+        device: str, optional
+            "cpu" or "cuda". With "cuda" the bias grids are stored on the gpu with cupy, which only pays off
+            for large grids and long simulations (default: "cpu")
         '''
+        if (device not in ("cpu", "cuda")):
+            raise ValueError("The device of the metadynamics bias grid has to be 'cpu' or 'cuda', but was: "
+                             + str(device))
 
         self.origPotential = origPotential
         self.n_trigger = n_trigger
         self.amplitude = amplitude
-        self.sigma = sigma
+        self._set_gaussian_width(sigma)
         self.biasPotentialType = gaussPotential
+        self.device = device
 
         # grid where the bias is stored
         # currently only for 1D
-        self.bias_grid_energy = np.zeros(numbins)  # energy grid
-        self.bias_grid_force = np.zeros(numbins)  # force grid
+        # single precision halves the memory and bandwidth needed for large grids
+        xp = self._array_module()
+        self.bias_grid_energy = xp.zeros(numbins, dtype=precision)  # energy grid
+        self.bias_grid_force = xp.zeros(numbins, dtype=precision)  # force grid
         # get center value for each bin
         bin_half = (bias_grid_max - bias_grid_min) / (2 * numbins)  # half bin width
         self.bin_centers = np.linspace(bias_grid_min + bin_half, bias_grid_max - bin_half, numbins)
+        self._bias_grid_min = bias_grid_min
+        self._bin_dx = (bias_grid_max - bias_grid_min) / numbins  # bin width
+        # the grid is uniform, so the closest bin can be calculated directly from these
+        self._x0 = self.bin_centers[0]
+        self._inv_dx = 1.0 / self._bin_dx
+
+        # the added gaussian is only evaluated on the bins within +-6 sigma of the current position,
+        # the offsets of these bins to the bin of the current position are the same for each deposit.
+        self._kernel_half_width = int(np.ceil(6 * sigma * self._inv_dx))
+        self._kernel_positions = np.arange(-self._kernel_half_width, self._kernel_half_width + 1) * self._bin_dx
+
         # current_n counts when next metadynamic step should be applied
         self.current_n = 1
         # count how often the potential was updated
@@ -1299,8 +1394,7 @@ class metadynamicsPotential(_potential1DCls):
         self.constants = {**origPotential.constants}
 
         self.V_functional = origPotential.V
-        self.V_orig_part = self.V_functional.subs(self.constants)
-
+        self.V_orig_part = origPotential.V  # already substituted by the original potential
 
         super().__init__()
 
@@ -1349,20 +1443,63 @@ class metadynamicsPotential(_potential1DCls):
 
 
         '''
-        # do gaussian metadynamics
-        #print("A ", self.amplitude, "mu ", curr_position, "sigma ", self.sigma)
-        biasPotential = self.biasPotentialType(A=self.amplitude, mu=curr_position, sigma=self.sigma)
-        #print(biasPotential)
-        try:
-            new_bias_bin_energy = biasPotential.ene(self.bin_centers)
-            new_bias_bin_force = biasPotential.force(self.bin_centers)
-        except OverflowError:
-            print("Gaussian Overflows!")
-        #print("newENE", new_bias_bin_energy.shape, new_bias_bin_energy)
-        #print("newForce", new_bias_bin_force.shape, new_bias_bin_force)
+        # do gaussian metadynamics - only on the bins within +-6 sigma of the bin of the current position
+        center_bin = int(np.floor((curr_position - self._bias_grid_min) * self._inv_dx))
+        kernel_start = center_bin - self._kernel_half_width
+
+        # clip the kernel to the grid boundaries
+        grid_start = max(kernel_start, 0)
+        grid_end = min(center_bin + self._kernel_half_width + 1, self.bias_grid_energy.size)
+        if (grid_start >= grid_end):
+            return
+
+        # each deposit evaluates exp over the clipped +-6 sigma support in double precision, centered exactly on
+        # the current position (delta is its offset to the center bin).
+        delta = float(curr_position - (self._x0 + center_bin * self._bin_dx))
+        kernel = slice(grid_start - kernel_start, grid_end - kernel_start)
+        distance = self._kernel_positions[kernel] - delta
+        new_bias_bin_energy = self.amplitude * np.exp(-distance * distance * self._inv_two_sigma2)
+        new_bias_bin_force = -new_bias_bin_energy * distance * self._inv_sigma2
+
         # update bias grid
-        self.bias_grid_energy = self.bias_grid_energy + new_bias_bin_energy
-        self.bias_grid_force = self.bias_grid_force + new_bias_bin_force
+        xp = self._array_module()
+        self.bias_grid_energy[grid_start:grid_end] += xp.asarray(new_bias_bin_energy)
+        self.bias_grid_force[grid_start:grid_end] += xp.asarray(new_bias_bin_force)
+
+    def _bulk_deposit(self, positions, chunk_size: int = 1024):
+        '''
+        Adds gaussians centered on all given positions to the potential at once, e.g. when
+        post-processing a trajectory. This is equivalent to calling _update_potential for each
+        position, but vectorized over the positions.
+
+        Parameters
+        ----------
+        positions: Iterable[float]
+            x positions, the gaussians are centered on
+        chunk_size: int, optional
+            number of gaussians evaluated at once, limits the size of the intermediate arrays (default: 1024)
+
+        Returns
+        -------
+
+        '''
+        xp = self._array_module()
+        positions = np.array(positions, ndmin=1).ravel()
+        for chunk_start in range(0, positions.size, chunk_size):
+            distance = self.bin_centers[None, :] - positions[chunk_start:chunk_start + chunk_size, None]
+            distance = distance.astype(self.bias_grid_energy.dtype)
+            # the gaussians are evaluated in place, to avoid temporary arrays of the size of the chunk
+            new_bias_bin_energy = np.square(distance)
+            new_bias_bin_energy *= -self._inv_two_sigma2
+            np.exp(new_bias_bin_energy, out=new_bias_bin_energy)
+            new_bias_bin_energy *= self.amplitude
+
+            new_bias_bin_force = np.multiply(new_bias_bin_energy, distance)
+            new_bias_bin_force *= -self._inv_sigma2
+
+            # update bias grid
+            self.bias_grid_energy += xp.asarray(new_bias_bin_energy.sum(axis=0))
+            self.bias_grid_force += xp.asarray(new_bias_bin_force.sum(axis=0))
 
     # overwrite the energy and force
     def ene(self, positions):
@@ -1377,20 +1514,12 @@ class metadynamicsPotential(_potential1DCls):
         -------
         current energy
         '''
-
-        if isinstance(positions, float) or isinstance(positions, int):
-            current_bin = self._find_nearest(self.bin_centers, positions)
-            #print(current_bin, len(self.bias_grid_energy))
-            bias_contribution = self.bias_grid_energy[current_bin]
-            orig_potential = self._calculate_energies(np.squeeze(positions))
-            #print(bias_contribution, orig_potential)
-            return np.squeeze(orig_potential + bias_contribution)
-        else:
-            bias_list = []
-            for entry in positions:
-                current_bin = self._find_nearest(self.bin_centers, entry)
-                bias_list.append(self.bias_grid_energy[current_bin])
-            return np.squeeze(self._calculate_energies(np.squeeze(positions)) + np.array(bias_list))
+        # single positions are treated as arrays of size one, so there is only one code path
+        positions = np.squeeze(np.array(positions, dtype=np.float64))
+        # the grid is uniform, therefore the bins can be directly calculated for all positions
+        bias_contribution = self._bias_lookup(self.bias_grid_energy, positions)
+        # the grid might be single precision, the returned energies are always double precision
+        return np.squeeze(self._calculate_energies(positions) + bias_contribution.astype(np.float64))
 
     def force(self, positions):
         '''
@@ -1406,32 +1535,59 @@ class metadynamicsPotential(_potential1DCls):
         -------
         '''
 
-        current_bin = np.array([self._find_nearest(self.bin_centers, pos) for pos in np.array(positions, ndmin=1)])
-        force = np.squeeze(self._calculate_dVdpos(positions) + self.bias_grid_force[current_bin])
-        #print("Force: ",current_bin, self.bias_grid_force[current_bin], force)
+        positions = np.squeeze(np.array(positions, dtype=np.float64))
+        bias_contribution = self._bias_lookup(self.bias_grid_force, positions)
+        force = np.squeeze(self._calculate_dVdpos(positions) + bias_contribution.astype(np.float64))
         return force
 
-    def _find_nearest(self, array, value):
+    def _find_nearest(self, value):
         '''
-        Function that finds position of the closest entry to a given value in an array
+        Function that finds the bin of the metadynamics grid closest to a given value.
+        As the grid is uniform, the index can be calculated directly from the bin width.
 
         Parameters
         ----------
-        array: np.array
-            1D array containing the midpoints of the metadynamics grid
         value: int or float
             search value
         Returns
 
-        Index of the entry closest to the given value
+        Index of the bin closest to the given value
         -------
 
         '''
-        idx = np.searchsorted(array, value, side="left")
-        if idx > 0 and (idx == len(array)):  #Why, looks like an earlier version?: or np.abs(value - array[idx - 1]) < np.abs(value - array[idx])
-            return idx - 1
+        return _nearest_uniform(value, self._x0, self._inv_dx, self.bias_grid_energy.size)
+
+    def _bias_lookup(self, grid, positions):
+        '''
+        Looks up the values of the bias grid in the bins closest to the positions.
+
+        Parameters
+        ----------
+        grid: array
+            bias energy or force grid
+        positions: np.array
+            positions on the 1D potential energy surface
+
+        Returns
+
+        grid values for the flattened positions, always on the host
+        -------
+
+        '''
+        if (self.device == "cuda"):
+            return _grid_lookup_cuda(np.ravel(positions), grid, self._x0, self._inv_dx)
         else:
-            return idx
+            return _grid_lookup(np.ravel(positions), grid, self._x0, self._inv_dx)
+
+    def _array_module(self):
+        '''
+        returns the array module the bias grids are stored with, numpy or cupy for the gpu.
+        '''
+        if (self.device == "cuda"):
+            import cupy  # optional, only needed for bias grids on the gpu
+            return cupy
+        else:
+            return np
 
 
 #### OLD FUNCTIONS ###
@@ -1441,7 +1597,8 @@ class _timedependendBias(_potential1DCls):
     The timedependend bias potential adds a user defined potential on top of
     the original potential.
 
-    This implementation uses sympy instead of a grid and is therefore super slow
+    As the same potential is added in each step, the bias is accumulated as a
+    counter of added potentials, that scales the once lambdified added potential.
     '''
     name: str = "Metadynamics Enhanced Sampling System"
     position = sp.symbols("r")
@@ -1461,20 +1618,32 @@ class _timedependendBias(_potential1DCls):
         n_trigger : int
             Added potential will be added after every n_trigger'th steps
         '''
+        warnings.warn("_timedependendBias is deprecated, please use metadynamicsPotential.", DeprecationWarning)
+
         self.origPotential = origPotential
         self.n_trigger = n_trigger
         self.addPotential = addPotential
         # current_n counts when next potential adding step should be applied
         self.current_n = 1
+        # count how often the added potential was applied
+        self.n_added = 0
 
         self.constants = {**origPotential.constants, **addPotential.constants}
 
         self.V_orig = origPotential.V
-        self.V = self.V_orig.subs(self.constants)
-        self.dVdpos = sp.diff(self.V, self.position)
+        self.V_functional = self.V_orig
 
         super().__init__()
 
+    def _update_functions(self):
+        """
+        This function lambdifies the original potential and reuses the lambdified functions of the added potential.
+        """
+        super()._update_functions()
+
+        self._calculate_added_energies = self.addPotential._calculate_energies
+        self._calculate_added_dVdpos = self.addPotential._calculate_dVdpos
+
     def check_for_metastep(self, curr_position):
         '''
         Checks if the bias potential should be added at the current step
@@ -1502,18 +1671,50 @@ class _timedependendBias(_potential1DCls):
         -------
         '''
         # add potential to the system
-        self.V_functional = self.V + self.addPotential.V
-        self.V = self.V_functional.subs(self.constants)
-        self.dVdpos = sp.diff(self.V, self.position)
+        self.n_added += 1
+
+    # overwrite the energy and force
+    def ene(self, positions):
+        '''
+        calculates energy of particle also takes bias into account
+        Parameters
+        ----------
+        positions: tuple
+            position on 1D potential energy surface
+
+        Returns
+        -------
+        current energy
+        '''
+        positions = np.squeeze(np.array(positions))
+        return np.squeeze(self._calculate_energies(positions)
+                          + self.n_added * self._calculate_added_energies(positions))
 
+    def force(self, positions):
+        '''
+        calculates derivative with respect to position also takes bias into account
+
+        Parameters
+        ----------
+        positions: tuple
+            position on 1D potential energy surface
 
-class _metadynamicsPotentialSympy(_potential1DCls):
+        Returns
+        current derivative dh/dpos
+        -------
+        '''
+        positions = np.squeeze(np.array(positions))
+        return np.squeeze(self._calculate_dVdpos(positions) + self.n_added * self._calculate_added_dVdpos(positions))
+
+
+class _metadynamicsPotentialSympy(_gaussianBias1DCls):
     '''
     The metadynamics bias potential adds Gaussian potentials on top of
     the original potential. The added gaussian potential is centered on the current position.
     Thereby the valleys of the potential "flooded" and barrier crossing is easier
 
-    This implementation uses sympy instead of a grid and is therefore super slow
+    This implementation does not use a grid. The gaussian centers are stored and all gaussians are evaluated
+    numerically for each position, which gets slow with increasing simulation length.
     '''
 
     name: str = "Metadynamics Enhanced Sampling System using sympy"
@@ -1534,24 +1735,25 @@ class _metadynamicsPotentialSympy(_potential1DCls):
         n_trigger : int
             Metadynamics potential will be added after every n_trigger'th steps
         '''
+        warnings.warn("_metadynamicsPotentialSympy is deprecated, please use the grid based metadynamicsPotential.",
+                      DeprecationWarning)
 
         self.origPotential = origPotential
         self.biasPotential = gaussPotential
         self.n_trigger = n_trigger
         self.amplitude = amplitude
-        self.sigma = sigma
+        self._set_gaussian_width(sigma)
         # current_n counts when next metadynamic step should be applied
         self.current_n = 1
         # count how often the potential was updated
         self.finished_steps = 0
+        # centers of the added gaussians
+        self.hill_centers = np.array([])
 
-        self.constants = {}
-        self.constants.update(origPotential.constants)
-        self.constants.update(self.biasPotential(A=self.amplitude, sigma=self.sigma).constants)
+        self.constants = {**origPotential.constants}
 
         self.V_orig = origPotential.V
-        self.V = self.V_orig.subs(self.constants)
-        self.dVdpos = sp.diff(self.V, self.position)
+        self.V_functional = self.V_orig
 
         super().__init__()
 
@@ -1588,6 +1790,56 @@ class _metadynamicsPotentialSympy(_potential1DCls):
         '''
         # add potential to the system
         # do gaussian metadynamics
-        self.V_functional = self.V + self.biasPotential(A=self.amplitude, mu=curr_position, sigma=self.sigma).V
-        self.V = self.V_functional.subs(self.constants)
-        self.dVdpos = sp.diff(self.V, self.position)
+        self.hill_centers = np.append(self.hill_centers, curr_position)
+
+    def _calculate_hills(self, positions):
+        '''
+        evaluates all added gaussians for the given positions at once
+
+        Parameters
+        ----------
+        positions: np.array
+            positions on the 1D potential energy surface
+
+        Returns
+        -------
+        energies and derivatives of the summed up gaussians for the flattened positions
+        '''
+        distance = np.ravel(positions)[:, None] - self.hill_centers[None, :]
+        hill_energies = self.amplitude * np.exp(-distance * distance * self._inv_two_sigma2)
+        hill_forces = -hill_energies * distance * self._inv_sigma2
+        return hill_energies.sum(axis=1), hill_forces.sum(axis=1)
+
+    # overwrite the energy and force
+    def ene(self, positions):
+        '''
+        calculates energy of particle also takes bias into account
+        Parameters
+        ----------
+        positions: tuple
+            position on 1D potential energy surface
+
+        Returns
+        -------
+        current energy
+        '''
+        positions = np.squeeze(np.array(positions, dtype=np.float64))
+        bias_energies, _ = self._calculate_hills(positions)
+        return np.squeeze(self._calculate_energies(positions) + bias_energies)
+
+    def force(self, positions):
+        '''
+        calculates derivative with respect to position also takes bias into account
+
+        Parameters
+        ----------
+        positions: tuple
+            position on 1D potential energy surface
+
+        Returns
+        current derivative dh/dpos
+        -------
+        '''
+        positions = np.squeeze(np.array(positions, dtype=np.float64))
+        _, bias_forces = self._calculate_hills(positions)
+        return np.squeeze(self._calculate_dVdpos(positions) + bias_forces)
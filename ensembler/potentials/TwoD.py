@@ -7,7 +7,7 @@ from typing import List
 import numpy as np
 import sympy as sp
 
-from ensembler.potentials._basicPotentials import _potential2DCls
+from ensembler.potentials._basicPotentials import _potential2DCls, _evaluate_numbers
 from ensembler.util.ensemblerTypes import systemCls
 
 
@@ -377,11 +377,11 @@ class gaussPotential(_potential2DCls):
         This function is needed to simplyfiy the symbolic equation on the fly and to calculate the position derivateive.
         """
 
-        self.V = self.V_functional.subs(self.constants)
+        self.V = _evaluate_numbers(self.V_functional.subs(self.constants))
 
         self.dVdpos_functional = sp.diff(self.V_functional, self.position)  # not always working!
         self.dVdpos = sp.diff(self.V, self.position)
-        self.dVdpos = self.dVdpos.subs(self.constants)
+        self.dVdpos = _evaluate_numbers(self.dVdpos.subs(self.constants))
 
         self._calculate_energies = sp.lambdify(self.position, self.V, "numpy")
         self._calculate_dVdpos = sp.lambdify(self.position, self.dVdpos, "numpy")
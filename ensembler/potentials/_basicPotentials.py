@@ -6,6 +6,16 @@ from ensembler.util.ensemblerTypes import Iterable, Union, Dict, Number
 
 # from concurrent.futures.thread import ThreadPoolExecutor
 
+def _evaluate_numbers(expr: sp.Expr) -> sp.Expr:
+    """
+    converts the symbolic numbers (e.g. pi, exp(2), 1/3) in an expression to floats, so that the lambdified
+    functions only contain numeric literals. In contrast to evalf(), sums are not evaluated numerically.
+    """
+    if isinstance(expr, sp.MatrixBase):
+        return expr.applyfunc(_evaluate_numbers)
+    return expr.replace(lambda x: x.is_number and not (x.is_Integer or x.is_Float), lambda x: x.evalf())
+
+
 class _potentialCls(_baseClass):
     """
     potential base class - the mother of all potential classes (or father).
@@ -130,11 +140,12 @@ class _potentialNDCls(_potentialCls):
         This function is needed to simplyfiy the symbolic equation on the fly and to calculate the position derivateive.
         """
 
-        self.V = self.V_functional.subs(self.constants).expand() # expand does not work reliably with gaussians due to exp
+        # expand does not work reliably with gaussians due to exp
+        self.V = _evaluate_numbers(self.V_functional.subs(self.constants).expand())
 
         self.dVdpos_functional = sp.diff(self.V_functional, self.position)  # not always working!
         self.dVdpos = sp.diff(self.V, self.position)
-        self.dVdpos = self.dVdpos.subs(self.constants)
+        self.dVdpos = _evaluate_numbers(self.dVdpos.subs(self.constants))
 
         self._calculate_energies = sp.lambdify(self.position, self.V, "numpy")
         self._calculate_dVdpos = sp.lambdify(self.position, self.dVdpos, "numpy")
@@ -317,7 +328,7 @@ class _potential1DClsPerturbed(_potential1DCls):
         super()._update_functions()
 
         self.dVdlam_functional = sp.diff(self.V_functional, self.lam)
-        self.dVdlam = self.dVdlam_functional.subs(self.constants)
+        self.dVdlam = _evaluate_numbers(self.dVdlam_functional.subs(self.constants))
         self._calculate_dVdlam = sp.lambdify(self.position, self.dVdlam, "numpy")
 
     """
@@ -173,7 +173,8 @@ class system(_baseClass):
 
     @property
     def trajectory(self) -> pd.DataFrame:
-        return pd.DataFrame(list(map(lambda x: x._asdict(), self._trajectory)), columns=list(self.state.__dict__["_fields"]))
+        # the states are buffered as namedtuples and the DataFrame is only built on access
+        return pd.DataFrame(self._trajectory, columns=list(self.state.__dict__["_fields"]))
 
     @property
     def position(self) -> Union[Number, Iterable[Number]]:
@@ -182,7 +183,7 @@ class system(_baseClass):
     @position.setter
     def position(self, position: Union[Number, Iterable[Number]]):
         self._currentPosition = position
-        if (len(self.trajectory) == 0):
+        if (len(self._trajectory) == 0):
             self.initial_position = self._currentPosition
         self._update_energies()
         self.update_current_state()
@@ -573,7 +574,7 @@ class system(_baseClass):
         self._currentTemperature = self.current_state.temperature
         self._currentTotE = self.current_state.total_system_energy
         self._currentTotPot = self.current_state.total_potential_energy
-        self._currentTotKin = self.state.total_kinetic_energy
+        self._currentTotKin = self.current_state.total_kinetic_energy
         self._currentForce = self.current_state.dhdpos
         self._currentVelocities = self.current_state.velocity
 
@@ -587,7 +588,7 @@ class system(_baseClass):
         NoReturn
 
         """
-        self.currentState = self.state(**self.trajectory.iloc[-1].to_dict())
+        self._currentState = self._trajectory[-1]
         self._update_current_vars_from_current_state()
         return
 
@@ -628,7 +629,7 @@ class system(_baseClass):
             self._init_velocities()
 
         if (withdraw_traj):
-            self._trajectory = []
+            self.clear_trajectory()
             self._trajectory.append(self.current_state)
 
         self.update_current_state()
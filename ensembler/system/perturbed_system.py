@@ -3,6 +3,8 @@ Module: System
     This module shall be used to implement subclasses of system. It wraps all information needed and generated by a simulation.
 """
 
+import warnings
+
 import numpy as np
 import pandas as pd
 
@@ -58,7 +60,8 @@ class perturbedSystem(system):
 
     def __init__(self, potential: _perturbedPotentialCls=linearCoupledPotentials(), sampler: samplerCls=metropolisMonteCarloIntegrator(),
                  conditions: Iterable[conditionCls] = [],
-                 temperature: float = 298.0, start_position: (Iterable[Number] or float) = None, lam: float = 0.0):
+                 temperature: float = 298.0, start_position: (Iterable[Number] or float) = None, lam: float = 0.0,
+                 store_stride: int = 1):
         """
             __init__
                 construct a eds-System that can be used to manage a simulation.
@@ -77,7 +80,14 @@ class perturbedSystem(system):
             starting position for the simulation and setup of the system.
         lam: Number, optional
             the value of the copuling lambda
+        store_stride: int, optional
+            only every store_stride'th state appended with append_state is stored in the trajectory (default: 1)
         """
+        if (store_stride < 1):
+            raise ValueError("The store_stride of the system has to be at least 1, but was: " + str(store_stride))
+        self.store_stride = store_stride
+        self._step_idx = 0  # counts the appended states
+
         super().__init__(potential=potential, sampler=sampler, conditions=conditions, temperature=temperature,
                          start_position=start_position)
 
@@ -130,11 +140,12 @@ class perturbedSystem(system):
     def update_system_properties(self) -> NoReturn:
         """
             updateSystemProperties
-                update all system properties
+                update all system properties and the current state
         """
         self._update_energies()
         self._update_temperature()
         self._update_dHdLambda()
+        self.update_current_state()
 
     def update_current_state(self):
         """
@@ -153,7 +164,8 @@ class perturbedSystem(system):
                      new_lambda: Number) -> NoReturn:
         """
             append_state
-                Append a new state to the trajectory.
+                Append a new state to the trajectory. The current state is always updated,
+                but only every store_stride'th state is stored in the trajectory.
 
         Parameters
         ----------
@@ -175,9 +187,47 @@ class perturbedSystem(system):
         self._update_temperature()
         self._update_energies()
         self._update_dHdLambda()
+        # the current state is only built once, after all properties are updated
         self.update_current_state()
 
-        self._trajectory.append(self.current_state)
+        if (self._step_idx % self.store_stride == 0):
+            self._trajectory.append(self.current_state)
+        self._step_idx += 1
+
+    def revert_step(self) -> NoReturn:
+        """
+            revert_step
+                sets the system back to the last stored state before the current one.
+                With a store_stride > 1 the states in between are not stored, therefore more than one step can be
+                reverted.
+
+        Returns
+        -------
+        NoReturn
+        """
+        unstored_steps = (self._step_idx - 1) % self.store_stride if (self._step_idx > 0) else 0
+        if (unstored_steps > 0):
+            # the current state was not stored, the last stored state is the one before it
+            if (unstored_steps > 1):
+                warnings.warn("Reverting " + str(unstored_steps) + " steps to the last stored state!")
+            self._currentState = self._trajectory[-1]
+            self._update_current_vars_from_current_state()
+            self._step_idx -= unstored_steps
+        else:
+            n_stored = len(self._trajectory)
+            super().revert_step()
+            if (len(self._trajectory) < n_stored):
+                if (self.store_stride > 1 and self._step_idx > 1):
+                    warnings.warn("Reverting " + str(self.store_stride) + " steps to the last stored state!")
+                self._step_idx = max(self._step_idx - self.store_stride, 0)
+
+    def clear_trajectory(self):
+        """
+        deletes all entries of trajectory and restarts the store_stride counting of the appended states
+        :return: None
+        """
+        super().clear_trajectory()
+        self._step_idx = 0
 
     """
     Functionality
@@ -195,5 +245,4 @@ class perturbedSystem(system):
 
         """
         self._currentdHdLambda = self.potential.dvdlam(self._currentPosition)
-        self.update_current_state()
         return self._currentdHdLambda
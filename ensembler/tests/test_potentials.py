@@ -1,7 +1,10 @@
 import os
+import sys
 import tempfile
+import types
 import unittest
 from numbers import Number
+from unittest import mock
 
 import numpy as np
 
@@ -25,18 +28,21 @@ class test_potentialCls(unittest.TestCase):
             __class__.tmp_test_dir = tempfile.mkdtemp(dir=test_dir, prefix="tmp_test_potentials")
         _, self.tmp_out_path = tempfile.mkstemp(prefix="test_" + self.potential_class.name, suffix=".obj", dir=__class__.tmp_test_dir)
 
+    def _make_potential(self):
+        return self.potential_class()
+
     def test_constructor(self):
-        potential = self.potential_class()
+        potential = self._make_potential()
         print(potential)
 
     def test_save_obj_str(self):
         path = self.tmp_out_path
-        out_path = self.potential_class().save(path=path)
+        out_path = self._make_potential().save(path=path)
         print(out_path)
 
     def test_load_str_path(self):
         path = self.tmp_out_path
-        out_path = self.potential_class().save(path=path)
+        out_path = self._make_potential().save(path=path)
 
         cls = self.potential_class.load(path=out_path)
         print(cls)
@@ -93,6 +99,55 @@ class potentialCls_flatwell(test_potentialCls):
                              msg="The results of " + potential.name + " are not correct!")
 
 
+class potentialCls_dummyPotential(test_potentialCls):
+    potential_class = OneD.dummyPotential
+
+    def test_energies(self):
+        y_shift = 3.0
+        positions = [0, 2, 1, 0.5]
+        expected_result = np.array([3.0, 3.0, 3.0, 3.0])
+
+        potential = self.potential_class(y_shift=y_shift)
+
+        energies = potential.ene(positions)
+
+        self.assertEqual(type(expected_result), type(energies),
+                         msg="returnType of potential was not correct! it should be an np.array")
+        self.assertListEqual(list(expected_result), list(energies),
+                             msg="The results of " + potential.name + " are not correct!")
+        # the constant energies are a read-only view of the cached value, not a new array
+        self.assertFalse(energies.flags.writeable)
+        self.assertTrue(np.shares_memory(energies, potential._cached_const))
+
+    def test_dVdpos(self):
+        positions = [0, 2, 1, 0.5]
+        expected_result = np.array([0, 0, 0, 0])
+
+        potential = self.potential_class(y_shift=3.0)
+
+        forces = potential.force(positions)
+
+        self.assertEqual(type(expected_result), type(forces),
+                         msg="returnType of potential was not correct! it should be an np.array")
+        self.assertListEqual(list(expected_result), list(forces),
+                             msg="The results of " + potential.name + " are not correct!")
+        self.assertFalse(forces.flags.writeable)
+        self.assertTrue(np.shares_memory(forces, potential._cached_zero))
+
+    def test_load_str_path(self):
+        positions = [0, 2, 1, 0.5]
+        potential = self.potential_class(y_shift=3.0)
+        out_path = potential.save(path=self.tmp_out_path)
+
+        cls = self.potential_class.load(path=out_path)
+
+        self.assertListEqual(list(potential.ene(positions)), list(cls.ene(positions)),
+                             msg="The energies of the loaded " + potential.name + " are not correct!")
+        self.assertListEqual(list(potential.force(positions)), list(cls.force(positions)),
+                             msg="The forces of the loaded " + potential.name + " are not correct!")
+        self.assertTrue(np.shares_memory(cls.ene(positions), cls._cached_const))
+
+
 class potentialCls_harmonicOsc1D(test_potentialCls):
     potential_class = OneD.harmonicOscillatorPotential
 
@@ -1566,6 +1621,209 @@ class potentialCls_metadynamics(test_potentialCls):
         np.testing.assert_almost_equal(desired=expected_result, actual=forces,
                                        err_msg="The results of " + potential.name + " are not correct!")
 
+    def test_update_potential(self):
+        amplitude = 0.1
+        sigma = 1
+        position = 5.02
+        gauss = OneD.gaussPotential(A=amplitude, mu=position, sigma=sigma)
+
+        potential = self.potential_class(amplitude=amplitude, sigma=sigma)
+        potential._update_potential(position)
+
+        np.testing.assert_almost_equal(desired=gauss.ene(potential.bin_centers), actual=potential.bias_grid_energy,
+                                       err_msg="The bias energy grid of " + potential.name + " is not correct!")
+        np.testing.assert_almost_equal(desired=gauss.force(potential.bin_centers), actual=potential.bias_grid_force,
+                                       err_msg="The bias force grid of " + potential.name + " is not correct!")
+
+        # narrow gaussians on a coarse grid underflow far from their center
+        for sigma, numbins in ((0.05, 10), (0.1, 1)):
+            positions = np.linspace(0, 10, 7)
+            potential = self.potential_class(amplitude=amplitude, sigma=sigma, numbins=numbins)
+            for position in positions:
+                potential._update_potential(position)
+
+            expected_energy = sum(OneD.gaussPotential(A=amplitude, mu=position, sigma=sigma).ene(potential.bin_centers)
+                                  for position in positions)
+            self.assertTrue(np.all(np.isfinite(potential.bias_grid_energy)))
+            self.assertTrue(np.all(np.isfinite(potential.bias_grid_force)))
+            self.assertTrue(np.isfinite(potential.ene(4.9)))
+            np.testing.assert_almost_equal(desired=expected_energy, actual=potential.bias_grid_energy,
+                                           err_msg="The bias energy grid of " + potential.name + " is not correct!")
+
+    def test_bulk_deposit(self):
+        positions = np.linspace(-1, 11, 250)
+
+        potential = self.potential_class(precision=np.float64)
+        for position in positions:
+            potential._update_potential(position)
+
+        bulk_potential = self.potential_class(precision=np.float64)
+        bulk_potential._bulk_deposit(positions, chunk_size=64)
+
+        np.testing.assert_almost_equal(desired=potential.bias_grid_energy, actual=bulk_potential.bias_grid_energy,
+                                       err_msg="The bias energy grid of " + potential.name + " is not correct!")
+        np.testing.assert_almost_equal(desired=potential.bias_grid_force, actual=bulk_potential.bias_grid_force,
+                                       err_msg="The bias force grid of " + potential.name + " is not correct!")
+
+    def test_device_cuda(self):
+        # numpy backed stand-in for cupy, so the gpu code path can be tested without a gpu
+        fake_cupy = types.ModuleType("cupy")
+        fake_cupy.zeros = np.zeros
+        fake_cupy.asarray = np.asarray
+        fake_cupy.asnumpy = np.asarray
+        fake_cupy.clip = np.clip
+        fake_cupy.intp = np.intp
+
+        positions = np.linspace(-1, 11, 25)
+        potential = self.potential_class()
+        potential._update_potential(5.02)
+        potential._bulk_deposit(positions, chunk_size=8)
+
+        with mock.patch.dict(sys.modules, {"cupy": fake_cupy}):
+            cuda_potential = self.potential_class(device="cuda")
+            cuda_potential._update_potential(5.02)
+            cuda_potential._bulk_deposit(positions, chunk_size=8)
+
+            np.testing.assert_almost_equal(desired=potential.bias_grid_energy,
+                                           actual=cuda_potential.bias_grid_energy,
+                                           err_msg="The bias energy grid of " + potential.name + " is not correct!")
+            np.testing.assert_almost_equal(desired=potential.bias_grid_force, actual=cuda_potential.bias_grid_force,
+                                           err_msg="The bias force grid of " + potential.name + " is not correct!")
+            np.testing.assert_almost_equal(desired=potential.ene(positions), actual=cuda_potential.ene(positions),
+                                           err_msg="The results of " + potential.name + " are not correct!")
+            np.testing.assert_almost_equal(desired=potential.force(positions), actual=cuda_potential.force(positions),
+                                           err_msg="The results of " + potential.name + " are not correct!")
+            np.testing.assert_almost_equal(desired=potential.ene(5.02), actual=cuda_potential.ene(5.02),
+                                           err_msg="The results of " + potential.name + " are not correct!")
+
+    def test_device_invalid(self):
+        with self.assertRaises(ValueError):
+            self.potential_class(device="tpu")
+
+
+class _deprecatedBiasPotentialTests:
+    """
+    the deprecated bias potentials need an original potential and warn on construction
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.origPotential = OneD.harmonicOscillatorPotential()
+
+    def _potential_kwargs(self) -> dict:
+        return {"origPotential": self.origPotential}
+
+    def _make_potential(self):
+        with self.assertWarns(DeprecationWarning):
+            return self.potential_class(**self._potential_kwargs())
+
+
+class potentialCls_timedependendBias(_deprecatedBiasPotentialTests, test_potentialCls):
+    potential_class = OneD._timedependendBias
+    n_trigger = 2
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.addPotential = OneD.gaussPotential(A=0.1, mu=1, sigma=0.5)
+
+    def _potential_kwargs(self) -> dict:
+        return {**super()._potential_kwargs(), "addPotential": self.addPotential, "n_trigger": self.n_trigger}
+
+    def test_load_str_path(self):
+        positions = np.array([0, 0.5, 1, 2])
+        potential = self._make_potential()
+        potential.check_for_metastep(0)
+        potential.check_for_metastep(0)
+
+        out_path = potential.save(path=self.tmp_out_path)
+        cls = self.potential_class.load(path=out_path)
+
+        self.assertEqual(potential.n_added, cls.n_added)
+        np.testing.assert_almost_equal(desired=potential.ene(positions), actual=cls.ene(positions),
+                                       err_msg="The energies of the loaded " + potential.name + " are not correct!")
+        np.testing.assert_almost_equal(desired=potential.force(positions), actual=cls.force(positions),
+                                       err_msg="The forces of the loaded " + potential.name + " are not correct!")
+
+    def test_energies(self):
+        n_added = 3
+        positions = np.array([0, 0.5, 1, 2])
+        potential = self._make_potential()
+        for _ in range(self.n_trigger * n_added):
+            potential.check_for_metastep(0)
+
+        expected_result = self.origPotential.ene(positions) + n_added * self.addPotential.ene(positions)
+        energies = potential.ene(positions)
+
+        self.assertEqual(n_added, potential.n_added)
+        np.testing.assert_almost_equal(desired=expected_result, actual=energies,
+                                       err_msg="The results of " + potential.name + " are not correct!")
+
+    def test_dVdpos(self):
+        n_added = 3
+        positions = np.array([0, 0.5, 1, 2])
+        potential = self._make_potential()
+        for _ in range(self.n_trigger * n_added):
+            potential.check_for_metastep(0)
+
+        expected_result = self.origPotential.force(positions) + n_added * self.addPotential.force(positions)
+        forces = potential.force(positions)
+
+        np.testing.assert_almost_equal(desired=expected_result, actual=forces,
+                                       err_msg="The results of " + potential.name + " are not correct!")
+
+
+class potentialCls_metadynamicsSympy(_deprecatedBiasPotentialTests, test_potentialCls):
+    potential_class = OneD._metadynamicsPotentialSympy
+    amplitude = 0.1
+    sigma = 0.5
+
+    def _potential_kwargs(self) -> dict:
+        return {**super()._potential_kwargs(), "amplitude": self.amplitude, "sigma": self.sigma, "n_trigger": 2}
+
+    def _make_biased_potential(self):
+        potential = self._make_potential()
+        # deposit two hills, every second step
+        for position in [1.0, 1.0, 2.5, 2.5]:
+            potential.check_for_metastep(position)
+        return potential
+
+    def _hills(self):
+        return [OneD.gaussPotential(A=self.amplitude, mu=position, sigma=self.sigma) for position in [1.0, 2.5]]
+
+    def test_load_str_path(self):
+        positions = np.array([0, 0.5, 1, 2, 3])
+        potential = self._make_biased_potential()
+
+        out_path = potential.save(path=self.tmp_out_path)
+        cls = self.potential_class.load(path=out_path)
+
+        np.testing.assert_almost_equal(desired=potential.ene(positions), actual=cls.ene(positions),
+                                       err_msg="The energies of the loaded " + potential.name + " are not correct!")
+        np.testing.assert_almost_equal(desired=potential.force(positions), actual=cls.force(positions),
+                                       err_msg="The forces of the loaded " + potential.name + " are not correct!")
+
+    def test_energies(self):
+        positions = np.array([0, 0.5, 1, 2, 3])
+        potential = self._make_biased_potential()
+
+        expected_result = self.origPotential.ene(positions) + sum(hill.ene(positions) for hill in self._hills())
+        energies = potential.ene(positions)
+
+        self.assertEqual(2, potential.finished_steps)
+        np.testing.assert_almost_equal(desired=expected_result, actual=energies,
+                                       err_msg="The results of " + potential.name + " are not correct!")
+        np.testing.assert_almost_equal(desired=expected_result[2], actual=potential.ene(1),
+                                       err_msg="The results of " + potential.name + " are not correct!")
+
+    def test_dVdpos(self):
+        positions = np.array([0, 0.5, 1, 2, 3])
+        potential = self._make_biased_potential()
+
+        expected_result = self.origPotential.force(positions) + sum(hill.force(positions) for hill in self._hills())
+        forces = potential.force(positions)
+
+        np.testing.assert_almost_equal(desired=expected_result, actual=forces,
+                                       err_msg="The results of " + potential.name + " are not correct!")
 
 
 class potentialCls_addedPotentials2D(test_potentialCls):
@@ -159,6 +159,22 @@ class test_System(unittest.TestCase):
         self.assertNotEqual(curState.velocity, not_expected_state.velocity,
                             msg="The not expected velocity equals the current one")
 
+    def test_update_state_from_traj(self):
+        sys = self.system_class(potential=self.pot, sampler=self.sampler, start_position=[0.1], temperature=300)
+
+        # e.g. a rejected replica exchange of the trajectories puts another state at the end of the trajectory
+        expected_state = sys.current_state._replace(position=10, total_kinetic_energy=12.5, velocity=-5)
+        sys._trajectory.append(expected_state)
+        sys._update_state_from_traj()
+
+        self.assertEqual(expected_state, sys.current_state, msg="The current state was not taken from the trajectory!")
+        self.assertEqual(expected_state.position, sys._currentPosition,
+                         msg="The current position was not taken from the trajectory!")
+        self.assertEqual(expected_state.velocity, sys._currentVelocities,
+                         msg="The current velocity was not taken from the trajectory!")
+        self.assertEqual(expected_state.total_kinetic_energy, sys._currentTotKin,
+                         msg="The current total_kinetic_energy was not taken from the trajectory!")
+
     def test_propergate(self):
         conditions = []
         temperature = 300
@@ -542,6 +558,69 @@ class test_perturbedSystem1D(test_System):
         self.assertEqual(curState.lam, expected_state.lam, msg="The initialised lam is not correct!")
         # self.assertEqual(np.isnan(curState.dhdlam), np.isnan(expected_state.dhdlam), msg="The initialised dHdlam is not correct!")
 
+    def test_append_state_store_stride(self):
+        newPositions = [1, 2, 3, 4, 5]
+
+        sys = self.system_class(potential=self.pot, sampler=self.sampler, start_position=0, store_stride=2)
+
+        for newPosition in newPositions:
+            sys.append_state(new_position=newPosition, new_velocity=0, new_forces=0, new_lambda=1.0)
+
+        # the initial state and every second appended state are stored
+        self.assertEqual(4, len(sys.trajectory), msg="The number of stored states is not correct!")
+        self.assertListEqual([0, 1, 3, 5], list(sys.trajectory.position), msg="The stored states are not correct!")
+        self.assertEqual(newPositions[-1], sys.current_state.position, msg="The current state was not updated!")
+
+        # reverting goes back to the last stored state before the current one
+        sys.append_state(new_position=6, new_velocity=0, new_forces=0, new_lambda=1.0)
+        sys.revert_step()
+        self.assertEqual(5, sys.current_state.position, msg="The reverted state is not correct!")
+        self.assertListEqual([0, 1, 3, 5], list(sys.trajectory.position), msg="A stored state was reverted!")
+        sys.append_state(new_position=6, new_velocity=0, new_forces=0, new_lambda=1.0)
+        sys.append_state(new_position=7, new_velocity=0, new_forces=0, new_lambda=1.0)
+        self.assertListEqual([0, 1, 3, 5, 7], list(sys.trajectory.position), msg="The stored states are not correct!")
+
+        # clearing the trajectory restarts the stride
+        sys.append_state(new_position=8, new_velocity=0, new_forces=0, new_lambda=1.0)
+        sys.clear_trajectory()
+        for newPosition in newPositions:
+            sys.append_state(new_position=newPosition, new_velocity=0, new_forces=0, new_lambda=1.0)
+        self.assertListEqual([1, 3, 5], list(sys.trajectory.position),
+                             msg="The stride was not restarted with the trajectory!")
+
+        sys.append_state(new_position=8, new_velocity=0, new_forces=0, new_lambda=1.0)
+        sys.initialise(withdraw_Traj=True, init_position=False)
+        for newPosition in newPositions:
+            sys.append_state(new_position=newPosition, new_velocity=0, new_forces=0, new_lambda=1.0)
+        self.assertListEqual([8, 1, 3, 5], list(sys.trajectory.position),
+                             msg="The stride was not restarted with the trajectory!")
+
+        sys.append_state(new_position=8, new_velocity=0, new_forces=0, new_lambda=1.0)
+        sys.simulate(steps=0, withdraw_traj=True, verbosity=False)
+        sys.append_state(new_position=1, new_velocity=0, new_forces=0, new_lambda=1.0)
+        self.assertEqual(1, sys.trajectory.position.iloc[-1], msg="The stride was not restarted with the trajectory!")
+
+        for store_stride in [0, -1]:
+            with self.assertRaises(ValueError):
+                self.system_class(potential=self.pot, sampler=self.sampler, start_position=0,
+                                  store_stride=store_stride)
+
+    def test_simulate_no_steps(self):
+        ha = potentials.OneD.harmonicOscillatorPotential(k=1.0)
+        hb = potentials.OneD.harmonicOscillatorPotential(k=4.0)
+        pot = potentials.OneD.linearCoupledPotentials(Va=ha, Vb=hb, lam=0.0)
+        sys = self.system_class(potential=pot, sampler=self.sampler, start_position=1.0, lam=1.0)
+
+        curState = sys.simulate(steps=0, verbosity=False)
+
+        # the returned and stored state contain the energies and dHdlam of the updated system properties
+        self.assertAlmostEqual(sys._currentTotPot, curState.total_potential_energy,
+                               msg="The returned total_potential_energy is not up to date!")
+        self.assertAlmostEqual(hb.ene(1.0), curState.total_potential_energy,
+                               msg="The returned total_potential_energy is not correct!")
+        self.assertAlmostEqual(pot.dvdlam(1.0), curState.dhdlam, msg="The returned dhdlam is not correct!")
+        self.assertEqual(curState, sys._trajectory[-1], msg="The stored state is not the returned one!")
+
     def test_revertStep(self):
         newPosition = 10
         newVelocity = -5
@@ -54,6 +54,8 @@ EXTRAS = {
            'sphinx_rtd_theme', #Documentation: style
            'nbsphinx', #Documentation: for inclusion of jupyter notebooks
            'm2r', #Documentation: converts markdown to rst
+           'numba', #Code: optional, jit compiles the metadynamics bias grid lookup
+           'cupy', #Code: optional, metadynamics bias grids on the gpu
 }
 
 # The rest you shouldn't have to touch too much :)